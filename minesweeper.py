@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""命令行扫雷游戏。
+
+直接运行: ``python minesweeper.py [行数 列数 雷数]``
+
+指令: ``o 行 列`` 翻开一格, ``f 行 列`` 插旗/取消插旗, ``q`` 退出。
+
+棋盘采用 Structure-of-Arrays 布局: 状态存放在四个平行的 uint8 平面
+(``is_mine`` / ``is_revealed`` / ``is_flagged`` / ``adjacent``) 中,
+每格只占 4 字节, 热路径都是对连续内存的线性扫描, 并且可以直接
+用 NumPy 做向量化运算。
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from scipy import ndimage as _ndimage
+except ImportError:  # SciPy 是可选加速项, 缺失时走纯 Python 洪泛
+    _ndimage = None
+
+try:
+    import numba as _numba
+except ImportError:  # Numba 同样可选, 有则把热核函数 JIT 成机器码
+    _numba = None
+
+
+def _adjacent_kernel(mines: np.ndarray, out: np.ndarray) -> None:
+    """邻雷计数热核: 对每格累加 3x3 窗口再减中心, 可被 Numba JIT。"""
+    rows, cols = mines.shape
+    for r in range(rows):
+        r_lo = r - 1 if r > 0 else 0
+        r_hi = r + 2 if r + 2 < rows else rows
+        for c in range(cols):
+            c_lo = c - 1 if c > 0 else 0
+            c_hi = c + 2 if c + 2 < cols else cols
+            total = 0
+            for nr in range(r_lo, r_hi):
+                for nc in range(c_lo, c_hi):
+                    total += mines[nr, nc]
+            out[r, c] = total - mines[r, c]
+
+
+def _flood_kernel(
+    adjacent: np.ndarray,
+    revealed: np.ndarray,
+    flagged: np.ndarray,
+    mines: np.ndarray,
+    row: int,
+    col: int,
+    stack: np.ndarray,
+) -> None:
+    """洪泛热核: 以 int32 下标栈迭代展开空白区域, 可被 Numba JIT。
+
+    ``revealed`` 平面本身充当访问标记; ``stack`` 由调用方提供,
+    容量至少 rows*cols。
+    """
+    rows, cols = adjacent.shape
+    top = 0
+    stack[top] = row * cols + col
+    top += 1
+    while top:
+        top -= 1
+        idx = stack[top]
+        r = idx // cols
+        c = idx % cols
+        r_lo = r - 1 if r > 0 else 0
+        r_hi = r + 2 if r + 2 < rows else rows
+        c_lo = c - 1 if c > 0 else 0
+        c_hi = c + 2 if c + 2 < cols else cols
+        for nr in range(r_lo, r_hi):
+            for nc in range(c_lo, c_hi):
+                if revealed[nr, nc] or flagged[nr, nc] or mines[nr, nc]:
+                    continue
+                revealed[nr, nc] = 1
+                if adjacent[nr, nc] == 0:
+                    stack[top] = nr * cols + nc
+                    top += 1
+
+
+if _numba is not None:
+    _adjacent_kernel = _numba.njit(cache=True, boundscheck=False)(_adjacent_kernel)
+    _flood_kernel = _numba.njit(cache=True, boundscheck=False)(_flood_kernel)
+
+# 八邻域偏移, 模块级常量, 洪泛内循环直接遍历, 不再重建嵌套循环
+_NEIGHBOR_OFFSETS = tuple(
+    (dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr, dc) != (0, 0)
+)
+
+# 渲染查表: 按邻雷数直接取字符, 0 显示为空格
+_DIGIT_STRINGS = np.array([" ", "1", "2", "3", "4", "5", "6", "7", "8"])
+
+
+def _plane_to_mask(plane: np.ndarray) -> int:
+    """把一个 0/1 uint8 平面打包成整数位掩码, 第 r*cols+c 位对应 (r, c)。"""
+    return int.from_bytes(np.packbits(plane, bitorder="little").tobytes(), "little")
+
+
+def _sample_indices(n: int, k: int) -> List[int]:
+    """从 ``range(n)`` 中无放回均匀抽取 k 个下标。
+
+    按 k 相对 n 的大小选择算法: ``k*k < n`` 时用插入(拒绝)抽样,
+    期望只需 O(k) 次随机数且零大块分配; ``k < n/2`` 时对
+    ``np.arange(n)`` 做部分 Fisher-Yates; 其余情况用蓄水池抽样。
+    """
+    if not 0 <= k <= n:
+        raise ValueError(f"抽样数量非法: k={k}, n={n}")
+    if k * k < n:
+        chosen = set()
+        out: List[int] = []
+        while len(out) < k:
+            i = random.randrange(n)
+            if i not in chosen:
+                chosen.add(i)
+                out.append(i)
+        return out
+    if 2 * k < n:
+        pool = np.arange(n)
+        for j in range(k):
+            i = random.randrange(j, n)
+            pool[j], pool[i] = pool[i], pool[j]
+        return pool[:k].tolist()
+    reservoir = list(range(k))
+    for i in range(k, n):
+        j = random.randrange(i + 1)
+        if j < k:
+            reservoir[j] = i
+    return reservoir
+
+
+@dataclass(slots=True)
+class Cell:
+    """单元格的快照视图, 仅用于对外接口, 不参与内部存储。"""
+
+    is_mine: bool
+    is_revealed: bool
+    is_flagged: bool
+    adjacent_mines: int
+
+
+class MinesweeperGame:
+    """扫雷棋盘。
+
+    内部不保存格子对象, 全部状态放在四个 ``(rows, cols)`` 的
+    uint8 平面里; 首次 ``reveal`` 时才布雷, 保证第一下不会踩雷。
+    """
+
+    def __init__(self, rows: int = 9, cols: int = 9, mines: int = 10) -> None:
+        if rows <= 0 or cols <= 0:
+            raise ValueError("棋盘行列数必须为正数")
+        if not 0 < mines < rows * cols:
+            raise ValueError("雷数必须在 1 到 rows*cols-1 之间")
+        self.rows = rows
+        self.cols = cols
+        self.mines = mines
+        # 平面实际按 (rows+2, cols+2) 分配, 多出的一圈是哨兵:
+        # 预标记为"已翻开、无雷、邻雷 0", 洪泛遍历邻居时不再需要
+        # 任何边界判断; 对外的 is_* 属性是去掉哨兵圈的内部视图
+        self._mine_p = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+        self._revealed_p = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+        self._flagged_p = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+        self._adjacent_p = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+        self._revealed_p[0, :] = self._revealed_p[-1, :] = 1
+        self._revealed_p[:, 0] = self._revealed_p[:, -1] = 1
+        self.is_mine = self._mine_p[1:-1, 1:-1]
+        self.is_revealed = self._revealed_p[1:-1, 1:-1]
+        self.is_flagged = self._flagged_p[1:-1, 1:-1]
+        self.adjacent = self._adjacent_p[1:-1, 1:-1]
+        self._zero_labels: Optional[np.ndarray] = None
+        self._flood_buf = np.empty(rows * cols, dtype=np.int32)
+        # 未翻开的安全格计数, 随每次翻开增量维护, 胜利判定 O(1)
+        self._total_safe = rows * cols - mines
+        self._remaining_safe = self._total_safe
+        # 渲染缓存: 棋面没变时重绘直接复用上次的文本
+        self._state_version = 0
+        self._render_cache: dict = {}
+        self._mines_placed = False
+        # 小棋盘时额外维护三个整数位掩码镜像, 集合类查询
+        # (旗数、是否完成) 退化为一次 popcount / 整数比较
+        self._use_bitmasks = rows * cols <= 4096
+        self._mine_mask = 0
+        self._revealed_mask = 0
+        self._flagged_mask = 0
+        self._all_mask = (1 << (rows * cols)) - 1
+        # 渲染用的表头/分隔线/行号只依赖行列数, 整局不变, 预先算好
+        self._header = " " * 4 + " ".join(f"{c + 1:>2}" for c in range(cols))
+        self._horizontal = "    " + "―" * (3 * cols - 1)
+        self._row_prefixes = [f"{r + 1:>3} " for r in range(rows)]
+
+    # ------------------------------------------------------------------
+    # 内部工具
+
+    def _place_mines(self, safe_row: int, safe_col: int) -> None:
+        """随机布雷, 保证 (safe_row, safe_col) 不是雷, 并统计邻雷数。
+
+        直接在 ``[0, rows*cols-1)`` 上抽整数下标, 再把越过安全格的
+        下标整体 +1, 避免物化一张 (r, c) 元组候选表。
+        """
+        n = self.rows * self.cols
+        safe_idx = safe_row * self.cols + safe_col
+        sampled = _sample_indices(n - 1, self.mines)
+        sampled = [i if i < safe_idx else i + 1 for i in sampled]
+        self.is_mine.flat[sampled] = 1
+        if self._use_bitmasks:
+            self._mine_mask = _plane_to_mask(self.is_mine)
+        self._compute_adjacent_counts()
+        self._zero_labels = None
+        self._mines_placed = True
+
+    def _compute_adjacent_counts(self) -> None:
+        """为每个格子统计八邻域内的雷数, 写入 ``adjacent`` 平面。
+
+        等价于用 3x3 全 1 卷积核对雷平面做卷积再减去中心:
+        雷平面自带哨兵零圈, 直接累加九个错位切片即可, 全程 C 级
+        向量运算。装了 Numba 时改走 JIT 过的双层循环热核。
+        """
+        if _numba is not None:
+            adj = np.zeros((self.rows, self.cols), dtype=np.uint8)
+            _adjacent_kernel(self.is_mine, adj)
+            self.adjacent[...] = adj
+            return
+        adj = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        for dr in range(3):
+            for dc in range(3):
+                adj += self._mine_p[dr : dr + self.rows, dc : dc + self.cols]
+        adj -= self.is_mine
+        self.adjacent[...] = adj
+
+    def _flood_reveal(self, row: int, col: int) -> None:
+        """从一个 adjacent==0 的格子出发, 翻开整片空白区域及其数字边界。
+
+        有 SciPy 时按连通分量整体翻开: 对零邻雷掩码做一次 8 连通
+        标号(懒缓存, 插旗/拔旗时失效), 取出 (row, col) 所在分量,
+        再膨胀一圈把数字边界带上, 一次位运算写回 ``is_revealed``。
+        旗子和栈式洪泛一样是硬挡板: 既不被翻开也不让洪泛穿过,
+        所以旗格要从掩码里抠掉, 不能只在写回时过滤。
+        装了 Numba 时优先走 JIT 过的下标栈热核。
+        """
+        if _numba is not None:
+            _flood_kernel(
+                self.adjacent,
+                self.is_revealed,
+                self.is_flagged,
+                self.is_mine,
+                row,
+                col,
+                self._flood_buf,
+            )
+            return
+        if _ndimage is None:
+            self._flood_reveal_py(row, col)
+            return
+        if self._zero_labels is None:
+            zero_mask = (
+                (self.adjacent == 0)
+                & (self.is_mine == 0)
+                & (self.is_flagged == 0)
+            )
+            self._zero_labels, _ = _ndimage.label(
+                zero_mask, structure=np.ones((3, 3))
+            )
+        cid = self._zero_labels[row, col]
+        if cid == 0:
+            return
+        component = self._zero_labels == cid
+        dilated = _ndimage.binary_dilation(component, structure=np.ones((3, 3)))
+        self.is_revealed |= dilated & (self.is_flagged == 0) & (self.is_mine == 0)
+
+    def _flood_reveal_py(self, row: int, col: int) -> None:
+        """无 SciPy 时的纯 Python 洪泛实现。
+
+        用显式栈迭代而不是递归: 大棋盘上一片空白可能上万格,
+        递归会触发 RecursionError, 迭代也省掉了每格的函数帧开销。
+        队列复用预分配的 ``_flood_buf`` int32 下标缓冲区, 并拿
+        ``is_revealed`` 平面本身当访问标记, 循环内零元组/零哈希。
+        按 FIFO 顺序(BFS)展开: 行优先编号下队列近似逐行扫描,
+        相邻访问落在同一批缓存行里, 比 LIFO 乱序跳行更友好。
+        每个零邻雷格至多入队一次, 缓冲区无需回绕。
+        直接在带哨兵圈的平面上以 padded 坐标遍历: 哨兵格预标记
+        为已翻开, 八个邻居可以无条件访问, 内循环零边界判断。
+        """
+        buf = self._flood_buf
+        pcols = self.cols + 2
+        mine_p = self._mine_p
+        revealed_p = self._revealed_p
+        flagged_p = self._flagged_p
+        adjacent_p = self._adjacent_p
+        buf[0] = (row + 1) * pcols + (col + 1)
+        head, tail = 0, 1
+        while head < tail:
+            idx = int(buf[head])
+            head += 1
+            r, c = divmod(idx, pcols)
+            for dr, dc in _NEIGHBOR_OFFSETS:
+                nr, nc = r + dr, c + dc
+                if revealed_p[nr, nc] or flagged_p[nr, nc] or mine_p[nr, nc]:
+                    continue
+                revealed_p[nr, nc] = 1
+                if adjacent_p[nr, nc] == 0:
+                    buf[tail] = nr * pcols + nc
+                    tail += 1
+
+    # ------------------------------------------------------------------
+    # 对外操作
+
+    def in_bounds(self, row: int, col: int) -> bool:
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def cell(self, row: int, col: int) -> Cell:
+        """返回指定格子的快照, 供外部代码检查棋盘。"""
+        if not self.in_bounds(row, col):
+            raise ValueError(f"坐标越界: ({row}, {col})")
+        return Cell(
+            is_mine=bool(self.is_mine[row, col]),
+            is_revealed=bool(self.is_revealed[row, col]),
+            is_flagged=bool(self.is_flagged[row, col]),
+            adjacent_mines=int(self.adjacent[row, col]),
+        )
+
+    def reveal(self, row: int, col: int) -> bool:
+        """翻开一格。踩到雷返回 False, 否则返回 True。"""
+        if not self.in_bounds(row, col):
+            raise ValueError(f"坐标越界: ({row}, {col})")
+        if not self._mines_placed:
+            self._place_mines(row, col)
+        if self.is_flagged[row, col] or self.is_revealed[row, col]:
+            return True
+        self.is_revealed[row, col] = 1
+        self._state_version += 1
+        if self._use_bitmasks:
+            self._revealed_mask |= 1 << (row * self.cols + col)
+        if self.is_mine[row, col]:
+            return False
+        self._remaining_safe -= 1
+        if self.adjacent[row, col] == 0:
+            self._flood_reveal(row, col)
+            if self._use_bitmasks:
+                self._revealed_mask = _plane_to_mask(self.is_revealed)
+            revealed_safe = int(
+                np.count_nonzero((self.is_revealed == 1) & (self.is_mine == 0))
+            )
+            self._remaining_safe = self._total_safe - revealed_safe
+        return True
+
+    def toggle_flag(self, row: int, col: int) -> None:
+        """在未翻开的格子上插旗或取消插旗。"""
+        if not self.in_bounds(row, col):
+            raise ValueError(f"坐标越界: ({row}, {col})")
+        if not self.is_revealed[row, col]:
+            self.is_flagged[row, col] ^= 1
+            self._state_version += 1
+            self._zero_labels = None
+            if self._use_bitmasks:
+                self._flagged_mask ^= 1 << (row * self.cols + col)
+
+    def count_flags(self) -> int:
+        """返回当前插旗数量。"""
+        if self._use_bitmasks:
+            return self._flagged_mask.bit_count()
+        return int(np.count_nonzero(self.is_flagged))
+
+    def is_complete(self) -> bool:
+        """所有非雷格子都已翻开时返回 True。"""
+        if self._use_bitmasks:
+            return (self._revealed_mask | self._mine_mask) == self._all_mask
+        return self._remaining_safe == 0
+
+    def board_as_strings(self, reveal_all: bool = False) -> List[List[str]]:
+        """把棋盘渲染成字符矩阵: ``#`` 未翻开, ``F`` 旗, ``*`` 雷, 数字为邻雷数。
+
+        整盘一次性用 ``np.where`` + 查表拼出, 不逐格走 if/elif。
+        """
+        mine = self.is_mine.astype(bool)
+        if reveal_all:
+            shown_mine = mine
+            hidden = np.zeros_like(mine)
+        else:
+            revealed = self.is_revealed.astype(bool)
+            shown_mine = mine & revealed
+            hidden = ~revealed
+        grid = np.where(
+            shown_mine,
+            "*",
+            np.where(
+                hidden,
+                np.where(self.is_flagged.astype(bool), "F", "#"),
+                _DIGIT_STRINGS[self.adjacent],
+            ),
+        )
+        return grid.tolist()
+
+
+# ----------------------------------------------------------------------
+# 命令行界面
+
+# parse_command 的动作码
+ACTION_REVEAL = 0
+ACTION_FLAG = 1
+ACTION_QUIT = 2
+ACTION_INVALID = 3
+
+
+def render_board(game: MinesweeperGame, reveal_all: bool = False) -> str:
+    """把棋盘画成带行列编号的文本, 坐标从 1 开始。
+
+    结果按 (状态版本号, reveal_all) 缓存: 无效指令等没改动棋面的
+    重绘直接返回上次的文本。只保留最近两帧, 封顶内存占用。
+    """
+    key = (game._state_version, reveal_all)
+    cached = game._render_cache.get(key)
+    if cached is not None:
+        return cached
+    lines = [game._header, game._horizontal]
+    for prefix, row in zip(game._row_prefixes, game.board_as_strings(reveal_all)):
+        lines.append(prefix + " ".join(f"{s:>2}" for s in row))
+    text = "\n".join(lines)
+    if len(game._render_cache) >= 2:
+        game._render_cache.clear()
+    game._render_cache[key] = text
+    return text
+
+
+def parse_command(text: str) -> Tuple[int, int, int]:
+    """解析一条指令, 返回 (动作码, 行, 列); 坐标转换为从 0 开始。
+
+    动作码是模块级 ACTION_* 整数常量, 无坐标时行列为 -1;
+    调用方分发只做整数比较, 每条指令也只分配一个三元组。
+    """
+    parts = text.split()
+    if not parts:
+        return ACTION_INVALID, -1, -1
+    action = parts[0].lower()
+    if action in ("q", "quit", "exit"):
+        return ACTION_QUIT, -1, -1
+    if action in ("o", "open", "f", "flag") and len(parts) == 3:
+        try:
+            row, col = int(parts[1]) - 1, int(parts[2]) - 1
+        except ValueError:
+            return ACTION_INVALID, -1, -1
+        return (ACTION_REVEAL if action in ("o", "open") else ACTION_FLAG), row, col
+    return ACTION_INVALID, -1, -1
+
+
+def run_game(rows: int = 9, cols: int = 9, mines: int = 10) -> None:
+    """主循环: 渲染棋盘、读取指令、更新状态, 直到胜负或退出。"""
+    game = MinesweeperGame(rows, cols, mines)
+    # 交互模式用 input() 保留整行编辑体验; 管道/脚本驱动时改用
+    # sys.stdin.readline, 省掉 input() 的提示与刷新开销
+    interactive = sys.stdin.isatty()
+    _read = sys.stdin.readline
+    print(f"扫雷 {rows}x{cols}, 共 {mines} 颗雷。o 行 列 翻开, f 行 列 插旗, q 退出。")
+    while True:
+        print()
+        print(render_board(game))
+        print(f"旗: {game.count_flags()}/{game.mines}")
+        if interactive:
+            try:
+                user_input = input("请输入指令: ")
+            except EOFError:
+                return
+        else:
+            sys.stdout.write("请输入指令: ")
+            sys.stdout.flush()
+            line = _read()
+            if not line:
+                return
+            user_input = line.rstrip("\n")
+        code, row, col = parse_command(user_input)
+        if code == ACTION_QUIT:
+            print("再见!")
+            return
+        if code == ACTION_INVALID:
+            print("无效指令, 示例: o 3 4 / f 3 4 / q")
+            continue
+        if not game.in_bounds(row, col):
+            print("坐标越界, 请重新输入。")
+            continue
+        if code == ACTION_FLAG:
+            game.toggle_flag(row, col)
+            continue
+        if not game.reveal(row, col):
+            print()
+            print(render_board(game, reveal_all=True))
+            print("踩到地雷, 游戏结束!")
+            return
+        if game.is_complete():
+            print()
+            print(render_board(game, reveal_all=True))
+            print("恭喜, 扫雷成功!")
+            return
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    if len(args) == 3:
+        run_game(int(args[0]), int(args[1]), int(args[2]))
+    elif args:
+        print("用法: python minesweeper.py [行数 列数 雷数]")
+        sys.exit(1)
+    else:
+        run_game()
+
+
+if __name__ == "__main__":
+    main()